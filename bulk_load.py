@@ -0,0 +1,59 @@
+"""
+File: bulk_load.py
+Function: Bulk loader -- fetch a query in binary format (psycopg3) straight into per-column buffers
+Author: Joseph Cho, ujcho@jacksongov.org
+"""
+
+import pandas as pd
+import psycopg
+from psycopg import postgres, sql
+
+NUMERIC_OID = postgres.types["numeric"].oid
+FETCH_CHUNK_ROWS = 2000
+
+
+# Define fetch_query_to_frame()
+def fetch_query_to_frame(conn: psycopg.Connection, sql_query: str, chunk_rows: int = FETCH_CHUNK_ROWS) -> pd.DataFrame:
+    """
+    Load `sql_query` over the binary wire format (no text parsing), `chunk_rows` rows at a time,
+    transposing each chunk into one list per column (only one chunk of row tuples is alive at once).
+    Enum and enum-array columns (e.g. 'Assigned Unit') are cast to text / text[] so they arrive as
+    Python lists instead of '{a,b}' strings -- parse_enum() passes lists through unchanged.
+    numeric columns are cast to float8, matching pd.read_sql's float columns (coerce_float)
+    instead of Decimal objects.
+
+    Binary COPY (COPY ... TO STDOUT (FORMAT BINARY)) was measured too and is slower: psycopg
+    decodes COPY rows one at a time in Python (see tools/bench_bulk_load.py).
+    """
+    subquery = sql.SQL(sql_query.strip().rstrip(";"))
+
+    with conn.cursor(binary=True) as cur:
+        # Column names + type OIDs, without fetching any rows
+        cur.execute(sql.SQL("SELECT * FROM ({}) AS q LIMIT 0").format(subquery))
+        names = [d.name for d in cur.description]
+        oids = [d.type_code for d in cur.description]
+
+        # Types psycopg has no binary loader for (enums, enum arrays, ...) are cast to text / text[]
+        unknown = list({oid for oid in oids if conn.adapters.types.get(oid) is None})
+        categories = {}
+        if unknown:
+            cur.execute("SELECT oid, typcategory FROM pg_type WHERE oid = ANY(%s)", (unknown,))
+            categories = dict(cur.fetchall())
+
+        select_list = []
+        for name, oid in zip(names, oids):
+            column = sql.Identifier(name)
+            if oid in categories or oid == NUMERIC_OID:
+                cast = "float8" if oid == NUMERIC_OID else "text[]" if categories[oid] == "A" else "text"
+                select_list.append(sql.SQL("{}::{} AS {}").format(column, sql.SQL(cast), column))
+            else:
+                select_list.append(column)
+
+        cur.execute(sql.SQL("SELECT {} FROM ({}) AS q").format(sql.SQL(", ").join(select_list), subquery))
+        columns = [[] for _ in names]
+        extends = [column.extend for column in columns]
+        while rows := cur.fetchmany(chunk_rows):
+            for extend, values in zip(extends, zip(*rows)):
+                extend(values)
+
+    return pd.DataFrame(dict(zip(names, columns)), columns=names)
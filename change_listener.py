@@ -0,0 +1,79 @@
+"""
+File: change_listener.py
+Function: Push-based cache invalidation -- background Postgres LISTEN thread (see sql/employee_info_notify.sql)
+Author: Joseph Cho, ujcho@jacksongov.org
+"""
+
+import logging
+import threading
+import time
+
+import psycopg
+from psycopg import sql
+
+logger = logging.getLogger(__name__)
+
+
+# --- Change listener ---
+
+class ChangeListener(threading.Thread):
+    """
+    Holds one idle connection LISTENing on `channel` and calls `on_change(payloads)` when
+    notifications arrive. Notifications are coalesced for `debounce_seconds`, so a burst of
+    row changes (e.g. a bulk update) triggers a single reload instead of one per row.
+    No polling: the thread blocks on the socket until the server pushes a notification.
+
+    Note: LISTEN needs a direct (session) connection -- on Neon, use the non-pooled
+    connection string, not the '-pooler' host.
+    """
+
+    def __init__(self, conninfo: str, channel: str, on_change, debounce_seconds: float = 0.5, reconnect_seconds: float = 5.0):
+        super().__init__(name=f"listen-{channel}", daemon=True)
+        self.conninfo = conninfo
+        self.channel = channel
+        self.on_change = on_change
+        self.debounce_seconds = debounce_seconds
+        self.reconnect_seconds = reconnect_seconds
+        self._stop_event = threading.Event()
+
+    def stop(self):
+        self._stop_event.set()
+
+    def run(self):
+        missed = False # True after a dropped connection: changes may have been missed while disconnected
+        while not self._stop_event.is_set():
+            try:
+                with psycopg.connect(self.conninfo, autocommit=True) as conn:
+                    conn.execute(sql.SQL("LISTEN {}").format(sql.Identifier(self.channel)))
+                    if missed:
+                        self._fire(["reconnect"])
+                        missed = False
+                    self._listen(conn)
+            except psycopg.OperationalError as e:
+                logger.warning("Change listener on %r disconnected: %s", self.channel, e)
+                missed = True
+                self._stop_event.wait(self.reconnect_seconds)
+            except Exception: # Anything else (LISTEN error, InterfaceError, decode error...) must not end the thread
+                logger.exception("Change listener on %r failed; reconnecting", self.channel)
+                missed = True
+                self._stop_event.wait(self.reconnect_seconds)
+
+    def _listen(self, conn: psycopg.Connection):
+        while not self._stop_event.is_set():
+            # Block until the first notification (wake up periodically only to honour stop())
+            payloads = [n.payload for n in conn.notifies(timeout=5.0, stop_after=1)]
+            if not payloads:
+                continue
+
+            # Coalesce the rest of the burst
+            deadline = time.monotonic() + self.debounce_seconds
+            while (remaining := deadline - time.monotonic()) > 0:
+                payloads += [n.payload for n in conn.notifies(timeout=remaining)]
+
+            self._fire(payloads)
+
+    def _fire(self, payloads: list[str]):
+        try:
+            self.on_change(payloads)
+        except Exception:
+            logger.exception("Change listener callback failed for %r", self.channel)
@@ -2,7 +2,10 @@ import streamlit as st
 from psycopg_pool import ConnectionPool
 import psycopg
 import pandas as pd
-import time
+
+from bulk_load import fetch_query_to_frame
+from notifications import notify
+from query_cache import QueryCache
 
 # --- Local .env file ---
 # from dotenv import load_dotenv
@@ -47,6 +50,8 @@ db_connection = get_database_session(database_url)
 # Define parse_enum()
 def parse_enum(array):
     """Return enum array dtypes in a workable format"""
+    if isinstance(array, list): # Already decoded (binary fetch path, see bulk_load.py)
+        return array
     if pd.isna(array):
         return []
     array = array.strip('{}')
@@ -111,20 +116,33 @@ def parse_month(type: str, value: str = None):
 
 # --- Define function to read tables from Neon DB ---
 
-@st.cache_data
-def query_table(sql_query: str, _connection: ConnectionPool = db_connection) -> pd.DataFrame:
+# Define get_query_cache()
+@st.cache_resource
+def get_query_cache() -> QueryCache:
+    """Query-result cache shared by every session (optional secrets: [query_cache] max_mb, ttl_seconds)"""
+    settings = st.secrets.get("query_cache", {})
+    return QueryCache(
+        max_bytes=int(settings.get("max_mb", 256)) * 2**20,
+        default_ttl=settings.get("ttl_seconds"), # None = until evicted/invalidated
+    )
+
+def query_table(sql_query: str, params: dict = None, ttl: float = None, _connection: ConnectionPool = db_connection) -> pd.DataFrame:
+    """Read a query through the shared QueryCache (single-flight, per-query `ttl`); the returned frame is shared -- do not modify it in place"""
     if _connection is None:
         return pd.DataFrame()
-    
-    try:
+
+    def load() -> pd.DataFrame:
         if isinstance(_connection, ConnectionPool):
             with _connection.connection() as conn:
-                df = pd.read_sql(sql_query, conn)
+                if not params:
+                    return fetch_query_to_frame(conn, sql_query) # binary-format bulk load
+                return pd.read_sql(sql_query, conn, params=params)
 
         else:
-            df = pd.read_sql(sql_query, _connection)
+            return pd.read_sql(sql_query, _connection, params=params)
 
-        return df
+    try:
+        return get_query_cache().get_or_load(sql_query, load, params=params, ttl=ttl)
     
     except psycopg.OperationalError as e:
         st.error(f"Database query failed: {e}")
@@ -132,14 +150,21 @@ def query_table(sql_query: str, _connection: ConnectionPool = db_connection) ->
 
 # --- Query tables ---
 
+# Text columns the page reads as None when missing ('PhotoID' is None, truthy 'Preferred Name', name strings);
+# pandas >= 3 infers string columns with NaN. Every other column keeps its dtype (numbers, dates).
+NULLABLE_TEXT_COLUMNS = ["PhotoID", "Preferred Name", "First Name", "Last Name", "Full Name", "Job Title", "Work Email Address"]
+
 # Get main STAFF_VIEW table
 staff_view = query_table("SELECT * FROM employee_info_view")
 
 if staff_view.empty:
     staff_view = pd.DataFrame()
-else:
-    staff_view["Assigned Unit"] = staff_view["Assigned Unit"].apply(parse_enum)
-    staff_view["Race"] = staff_view["Race"].apply(parse_enum)
+else: # assign() builds a new frame -- the cached one is shared
+    staff_view = staff_view.assign(**{
+        **{c: staff_view[c].astype(object).where(staff_view[c].notna(), None) for c in NULLABLE_TEXT_COLUMNS if c in staff_view},
+        "Assigned Unit": staff_view["Assigned Unit"].apply(parse_enum),
+        "Race": staff_view["Race"].apply(parse_enum),
+    })
 
 STAFF_VIEW = staff_view.copy()
 
@@ -184,14 +209,10 @@ def log_user(
                     )
                     conn.commit()
         except Exception as e2:
-            error_msg1 = st.error(f"Database reconnect failed: {e2}")
-            time.sleep(2)
-            error_msg1.empty()
+            notify(f"Database reconnect failed: {e2}", "error")
 
     except Exception as e:
-        error_msg2 = st.error(f"Error logging activity: {e}")
-        time.sleep(2)
-        error_msg2.empty()
+        notify(f"Error logging activity: {e}", "error")
 
 
 # Define refresh_app() function
@@ -1,10 +1,17 @@
 import streamlit as st
 from sqlalchemy import create_engine, text
-from sqlalchemy.engine import Engine
+from sqlalchemy.engine import Engine, make_url
 from dotenv import load_dotenv
 import pandas as pd
 import os
+import threading
 import time
+from contextlib import nullcontext
+
+from bulk_load import fetch_query_to_frame
+from change_listener import ChangeListener
+from notifications import notify
+from query_cache import QueryCache
 
 load_dotenv("../jcpao-csu.env", override=True)  # points up to parent directory
 
@@ -21,8 +28,15 @@ load_dotenv("../jcpao-csu.env", override=True)  # points up to parent directory
 # SQLALCHEMY - Define get_engine()
 @st.cache_resource
 def get_engine(database_url):
+    """
+    Plain postgresql:// URLs (e.g. the Neon connection string) are run on psycopg 3 (postgresql+psycopg://),
+    which query_table() needs for its binary-format loader; an explicit driver (e.g. postgresql+psycopg2://) is kept.
+    """
+    url = make_url(database_url)
+    if url.drivername == "postgresql":
+        url = url.set(drivername="postgresql+psycopg")
     return create_engine(
-        database_url,
+        url,
         pool_size=10,
         max_overflow=5,
         pool_pre_ping=True,
@@ -50,6 +64,8 @@ except Exception as e:
 # Define parse_enum()
 def parse_enum(array):
     """Return enum array dtypes in a workable format"""
+    if isinstance(array, list): # Already decoded (binary fetch path, see bulk_load.py)
+        return array
     if pd.isna(array):
         return []
     array = array.strip('{}')
@@ -107,37 +123,134 @@ def parse_month(type: str, value: str = None):
 
 # --- Define function to read tables from Neon DB ---
 
-@st.cache_data(show_spinner="Loading data, please wait...")
-def query_table(sql_query: str, _engine: Engine = engine) -> pd.DataFrame:
+# Define get_query_cache()
+@st.cache_resource
+def get_query_cache() -> QueryCache:
+    """Query-result cache shared by every session (optional secrets: [query_cache] max_mb, ttl_seconds)"""
+    settings = st.secrets.get("query_cache", {})
+    return QueryCache(
+        max_bytes=int(settings.get("max_mb", 256)) * 2**20,
+        default_ttl=settings.get("ttl_seconds"), # None = until evicted/invalidated
+    )
+
+def query_table(
+    sql_query: str,
+    params: dict = None,
+    ttl: float = None,
+    _engine: Engine = engine,
+    show_spinner: bool = True,
+) -> pd.DataFrame:
+    """
+    Read a query into a DataFrame through the shared QueryCache (keyed on SQL + params, per-query `ttl`).
+    Concurrent sessions missing on the same query trigger a single database query.
+    The returned frame is shared -- do not modify it in place.
+    """
     if _engine is None:
         return pd.DataFrame()
 
+    def load() -> pd.DataFrame: # Runs on a cache miss only -- so does the spinner
+        with st.spinner("Loading data, please wait...") if show_spinner else nullcontext(), _engine.connect() as conn:
+            if _engine.dialect.driver == "psycopg" and not params: # postgresql+psycopg:// -- binary-format bulk load
+                return fetch_query_to_frame(conn.connection.driver_connection, sql_query)
+            return pd.read_sql(text(sql_query), conn, params=params)
+
     try:
-        with _engine.connect() as conn:
-            return pd.read_sql(text(sql_query), conn)
+        return get_query_cache().get_or_load(sql_query, load, params=params, ttl=ttl)
     except Exception as e:
         st.error(f"Database query failed: {e}")
         return pd.DataFrame()
 
 # --- Query tables ---
 
-# Get main STAFF_VIEW table
-staff_view = query_table("SELECT * FROM employee_info_view")
+STAFF_VIEW_QUERY = "SELECT * FROM employee_info_view"
 
-if staff_view.empty:
-    staff_view = pd.DataFrame()
-else:
-    staff_view["Assigned Unit"] = staff_view["Assigned Unit"].apply(parse_enum)
-    staff_view["Race"] = staff_view["Race"].apply(parse_enum)
+# Text columns the page reads as None when missing ('PhotoID' is None, truthy 'Preferred Name', name strings);
+# pandas >= 3 infers string columns with NaN. Every other column keeps its dtype (numbers, dates).
+NULLABLE_TEXT_COLUMNS = ["PhotoID", "Preferred Name", "First Name", "Last Name", "Full Name", "Job Title", "Work Email Address"]
 
-STAFF_VIEW = staff_view.copy()
+# Define load_staff_view()
+def load_staff_view(show_spinner: bool = True) -> pd.DataFrame:
+    """Query the main STAFF_VIEW table and parse its enum array columns (into a new frame -- the cached one is shared)"""
+    staff_view = query_table(STAFF_VIEW_QUERY, show_spinner=show_spinner)
+
+    if staff_view.empty:
+        return pd.DataFrame()
+    return staff_view.assign(**{
+        **{c: staff_view[c].astype(object).where(staff_view[c].notna(), None) for c in NULLABLE_TEXT_COLUMNS if c in staff_view},
+        "Assigned Unit": staff_view["Assigned Unit"].apply(parse_enum),
+        "Race": staff_view["Race"].apply(parse_enum),
+    })
+
+class StaffViewStore:
+    """
+    Current STAFF_VIEW snapshot as (version, DataFrame), shared by every session.
+    reload() swaps in a fresh snapshot atomically; sessions keep reading the old one until then,
+    so a change never makes every session query the database at once.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.snapshot = (time.time_ns(), load_staff_view())
+
+    def reload(self):
+        """Re-query only the STAFF_VIEW snapshot (other cached queries are untouched)"""
+        with self._lock:
+            get_query_cache().invalidate(STAFF_VIEW_QUERY)
+            staff_view = load_staff_view(show_spinner=False) # Runs on the listener thread
+            if staff_view.empty and not self.snapshot[1].empty:
+                return # Query failed -- keep serving the previous snapshot
+            self.snapshot = (time.time_ns(), staff_view)
+
+# Define get_staff_view_store()
+@st.cache_resource
+def get_staff_view_store() -> StaffViewStore:
+    return StaffViewStore()
+
+# Define get_staff_view()
+def get_staff_view() -> tuple[int, pd.DataFrame]:
+    """Return the current STAFF_VIEW snapshot as (version, DataFrame); the version keys per-snapshot caches (e.g. the prepared roster)"""
+    start_change_listener() # cached -- starts this process's listener once (and again after refresh_app())
+    return get_staff_view_store().snapshot
+
+
+# --- Push-based invalidation (Postgres LISTEN/NOTIFY) ---
+
+# Define start_change_listener()
+@st.cache_resource(show_spinner=False)
+def start_change_listener(_engine: Engine = engine) -> ChangeListener | None:
+    """
+    Reload the STAFF_VIEW snapshot whenever the database NOTIFYs a change to a table behind
+    employee_info_view (install the triggers with sql/employee_info_notify.sql).
+    Secrets (all optional): [neonDB] listen = true/false, notify_channel (must match the channel the SQL
+    script was run with), listen_url (direct, non-pooled URL).
+    Cached: one listener per server process, even when Streamlit re-imports this module after an edit.
+    """
+    settings = st.secrets.get("neonDB", {})
+    if _engine is None or _engine.dialect.name != "postgresql" or not settings.get("listen", True):
+        return None
+
+    conninfo = settings.get("listen_url") or _engine.url.set(drivername="postgresql").render_as_string(hide_password=False)
+    listener = ChangeListener(
+        conninfo,
+        channel=settings.get("notify_channel", "employee_info_changed"),
+        on_change=lambda payloads: get_staff_view_store().reload(),
+    )
+    listener.start()
+    return listener
 
 
 # --- Log activity ---
 
+# Define get_login_log_state()
+@st.cache_resource
+def get_login_log_state() -> dict:
+    """Last time each user's login was written to courts_log (shared across sessions, used to dedupe logins)"""
+    return {"lock": threading.Lock(), "last_logged": {}}
+
 def log_user(
     email_address: str,
-    _engine: Engine = engine
+    _engine: Engine = engine,
+    dedupe_seconds: int = 60 * 60,
 ):
     """
     Log user activity in the user_activity table.
@@ -146,11 +259,20 @@ def log_user(
     Logs user login (to track who is using the directory).
     SQLAlchemy's pool_pre_ping (set on the engine above) checks for stale/closed
     connections before handing them out, so no manual reconnect retry is needed here.
+    Logins by the same user within `dedupe_seconds` of the last logged one are not written again.
     """
 
     if _engine is None:
         return
 
+    # Deduplicate per user per time window (skip the insert, not just the round trip)
+    state = get_login_log_state()
+    now = time.time()
+    with state["lock"]:
+        last_logged = state["last_logged"].get(email_address)
+        if last_logged is not None and now - last_logged < dedupe_seconds:
+            return
+
     try:
         with _engine.connect() as conn:
             conn.execute(
@@ -158,15 +280,18 @@ def log_user(
                 {"email": email_address},
             )
             conn.commit()
+        with state["lock"]: # Only once the row is committed -- a failed insert must not suppress the next login's log
+            state["last_logged"][email_address] = now
 
     except Exception as e:
-        error_msg = st.error(f"Error logging activity: {e}")
-        time.sleep(2)
-        error_msg.empty()
+        notify(f"Error logging activity: {e}", "error")
 
 
 # Define refresh_app() function
 def refresh_app():
+    change_listener = start_change_listener()
+    if change_listener is not None: # Clearing cache_resource below would orphan the running listener thread
+        change_listener.stop()
     st.cache_data.clear()
     st.cache_resource.clear()
     st.rerun()
@@ -9,21 +9,55 @@ import streamlit as st
 from pathlib import Path 
 import pandas as pd
 
-from connect_data2 import STAFF_VIEW
-from photo import load_photo
+from static_assets import get_logo_assets
+from connect_data2 import get_staff_view, get_query_cache
+from facets import format_facet
+from roster import PreparedRoster
+from photo import load_photo, get_headshot_cache, get_headshot_versions
 
 
 # --- Configure Streamlit page settings --- 
 jcpao_logo = Path("assets/logo/jcpao_logo_500x500.png")
+logo_assets = get_logo_assets() # precomputed placeholder for attorneys without a headshot
 
 # # --- JCPAO Streamlit page logo --- 
 # st.logo(jcpao_logo, size="large", link="https://www.jacksoncountyprosecutor.com")
 
-# --- Load data --- 
+# --- Load data (prepared once per data snapshot) --- 
 
-apa_data = STAFF_VIEW.copy()
-apa_data = apa_data.loc[apa_data["Position"].isin(['Exec', 'CTA', 'TTL', 'APA'])]
-apa_data.sort_values(by=["Last Name", "First Name"], ascending=[True, True], inplace=True, ignore_index=True)
+# Column filtered by each sidebar selectbox
+FACET_COLUMNS = {
+    "courtview_selected_position": "Position",
+    "courtview_selected_unit": "Assigned Unit",
+    "courtview_selected_location": "Office Location",
+}
+
+@st.cache_resource(max_entries=2)
+def get_prepared_roster(version: int, _staff_view: pd.DataFrame) -> PreparedRoster:
+    """Filter, sort and index the court-view roster once per STAFF_VIEW snapshot (shared read-only across sessions)"""
+    return PreparedRoster(version, _staff_view, list(FACET_COLUMNS.values()))
+
+roster = get_prepared_roster(*get_staff_view()) # new snapshot (e.g. after a database NOTIFY) -> new prepared roster
+apa_data = roster.df # read-only -- never modify in place
+
+# Local headshot proxy (None = serve headshots straight from Cloudinary)
+headshot_cache = get_headshot_cache()
+
+@st.cache_resource(max_entries=2, ttl=15 * 60)
+def prefetch_headshots(version: int) -> dict:
+    """
+    Warm the local headshot cache in the background once per roster snapshot (and at least every 15 minutes);
+    returns the current Cloudinary versions, so re-uploaded headshots replace their cached copies
+    """
+    headshot_versions = get_headshot_versions()
+    headshot_cache.prefetch(("JCPAO_headshots/" + photo_id for photo_id in apa_data["PhotoID"].dropna()), headshot_versions)
+    return headshot_versions
+
+headshot_versions = prefetch_headshots(roster.version) if headshot_cache is not None and not apa_data.empty else {}
+
+def current_selections() -> dict:
+    """Return the active sidebar filters as {column: value}"""
+    return {column: st.session_state[key] for key, column in FACET_COLUMNS.items()}
 
 
 # --- Initialize session state --- 
@@ -40,6 +74,9 @@ if "courtview_selected_location" not in st.session_state:
 if "courtview_searched_text" not in st.session_state: 
     st.session_state["courtview_searched_text"] = ""
 
+if "courtview_applied_search" not in st.session_state: # search text behind the current results (set on Search / filter change)
+    st.session_state["courtview_applied_search"] = ""
+
 if "courtview_view" not in st.session_state:
     st.session_state["courtview_view"] = "Main Directory"
 
@@ -49,24 +86,20 @@ if "courtview_view" not in st.session_state:
 # Define update_df() function
 def update_df():
 
-    filtered_df = apa_data.copy()
-
-    if st.session_state["courtview_selected_position"] != 'All':
-        filtered_df = filtered_df[filtered_df['Position']==st.session_state["courtview_selected_position"]].reset_index(drop=True)
-    if st.session_state["courtview_selected_unit"] != 'All':
-        filtered_df = filtered_df[filtered_df['Assigned Unit'].apply(lambda x: st.session_state["courtview_selected_unit"] in x)].reset_index(drop=True)
-    if st.session_state["courtview_selected_location"] != 'All': 
-        filtered_df = filtered_df[filtered_df['Office Location']==st.session_state["courtview_selected_location"]].reset_index(drop=True)
-    if st.session_state["courtview_searched_text"]: # Added searched_text to main clickback action 
-        searched_text = st.session_state["courtview_searched_text"].strip().lower()
-        words = list({w for w in searched_text.split() if w}) # split search text into unique words
-        search_cols = ["Full Name", "First Name", "Middle Name", "Last Name", "Suffix", "Preferred Name"]
-        combined = filtered_df[search_cols].astype(str).agg(" ".join, axis=1).str.lower() # combine searchable columns into a single lowercase string per row
-        mask = combined.apply(lambda text: any(word in text for word in words)) # match if ANY word appears in the combined text
-
-        filtered_df = filtered_df[mask].reset_index(drop=True)
+    # Position / unit / location via the facet groupings; searched_text (ANY word) via the precomputed search strings
+    st.session_state["courtview_filtered_df"] = roster.filter(
+        current_selections(),
+        st.session_state["courtview_searched_text"], # Added searched_text to main clickback action 
+    )
+    st.session_state["courtview_applied_search"] = st.session_state["courtview_searched_text"]
+    st.session_state["courtview_filtered_version"] = roster.version
 
-    st.session_state["courtview_filtered_df"] = filtered_df.reset_index(drop=True)
+# Define filtered_roster() function
+def filtered_roster() -> pd.DataFrame:
+    """Return this session's filtered roster, re-filtering only if the data snapshot changed since it was built"""
+    if st.session_state.get("courtview_filtered_version") != roster.version:
+        update_df()
+    return st.session_state["courtview_filtered_df"]
 
 # Reset filters button
 def reset_filters():
@@ -74,9 +107,50 @@ def reset_filters():
     st.session_state["courtview_selected_unit"] = "All"
     st.session_state["courtview_selected_location"] = "All"
     st.session_state["courtview_searched_text"] = ""
+    st.session_state["courtview_applied_search"] = ""
     # filtered_df = apa_data.copy()
     # st.session_state["courtview_filtered_df"] = filtered_df
     st.session_state["courtview_filtered_df"] = apa_data
+    st.session_state["courtview_filtered_version"] = roster.version
+
+# Logout button
+def logout():
+    st.session_state.clear()
+    st.query_params.clear() # Drop the signed session token so the next visit goes through the portal
+
+# --- Sidebar Filter labels --- 
+
+# Display labels only -- the options themselves are derived from the data (see FacetIndex.options)
+positions_dict = {
+    'All': 'All Job Positions', 
+    'Exec': 'Executive Staff', 
+    'CTA': 'Chief Trial Attorneys', 
+    'TTL': 'Team Trial Leaders', 
+    'APA': 'APAs',
+}
+
+units_dict = {
+    'All': 'All Units',
+    'Exec': 'Executive Staff',
+    'GCU': 'GCU, General Crimes',
+    'SVU': 'SVU, Special Victims',
+    'VCU': 'VCU, Violent Crimes',
+    'CSU': 'CSU, Crime Strategies',
+    'COMBAT': 'COMBAT',
+    'Drug': 'Drug Court',
+    'FSD': 'Family Support',
+    'WARRANT': 'Warrant Desk'
+}
+
+locations_dict = {
+    'All': 'All Office Locations',
+    'Dt-11': 'Downtown, 11th',
+    'Dt-10': 'Downtown, 10th',
+    'Dt-9': 'Downtown, 9th (COMBAT)',
+    'Dt-7M': 'Downtown, 7M',
+    'Indy': 'East Jack, Independence',
+    'FSD': 'Family Support'
+}
 
 # --- Sidebar Filter functions --- 
 
@@ -96,67 +170,45 @@ with st.sidebar:
             key="courtview_view"
         )
     st.divider()
+    # Options and counts come from the data (under the other filters and the applied search); dead-end options are hidden.
+    # Cached per (snapshot, filters, search) -- reruns that change nothing don't recount
+    facet_options = roster.facet_options(
+        {"Position": positions_dict, "Assigned Unit": units_dict, "Office Location": locations_dict},
+        current_selections(),
+        st.session_state["courtview_applied_search"],
+    )
+
     # Filter by job position: 
-    positions_dict = {
-        'All': 'All Job Positions', 
-        'Exec': 'Executive Staff', 
-        'CTA': 'Chief Trial Attorneys', 
-        'TTL': 'Team Trial Leaders', 
-        'APA': 'APAs',
-        # 'I': 'Investigators',
-        # 'VA': 'Victim Advocates',
-        # 'LA': 'Legal Assistants',
-        # 'SS': 'Support Staff',
-        # 'INTERN': 'Intern'
-    }
+    position_choices, position_counts = facet_options["Position"]
     position_options = st.selectbox(
         label= "**Filter by Position:**", 
-        options=positions_dict.keys(), # ('All', 'Exec', 'CTA', 'TTL', 'APA', 'I', 'VA', 'LA', 'SS')
+        options=position_choices, # ('All', 'Exec', 'CTA', 'TTL', 'APA') -- as present in the data
         index=0, # All
-        format_func=lambda x: positions_dict[x],
+        format_func=format_facet(positions_dict, position_counts),
         key='courtview_selected_position',
         placeholder="Select job position",
         on_change=update_df,
     )
 
     # Filter by unit_enum[]: 
-    units_dict = {
-        'All': 'All Units',
-        'Exec': 'Executive Staff',
-        'GCU': 'GCU, General Crimes',
-        'SVU': 'SVU, Special Victims',
-        'VCU': 'VCU, Violent Crimes',
-        'CSU': 'CSU, Crime Strategies',
-        # 'COMBAT': 'COMBAT',
-        'Drug': 'Drug Court',
-        'FSD': 'Family Support',
-        'WARRANT': 'Warrant Desk'
-    }
+    unit_choices, unit_counts = facet_options["Assigned Unit"]
     unit_options = st.selectbox(
         label="**Filter by Assigned Unit:**",
-        options=units_dict.keys(), # ('Exec', 'GCU', 'SVU', 'VCU', 'CSU', 'COMBAT', 'Drug', 'FSD')
+        options=unit_choices, # ('Exec', 'GCU', 'SVU', 'VCU', 'CSU', 'COMBAT', 'Drug', 'FSD', 'WARRANT') -- as present in the data
         index=0, # All
-        format_func=lambda x: units_dict[x],
+        format_func=format_facet(units_dict, unit_counts),
         key='courtview_selected_unit',
         placeholder="Select unit",
         on_change=update_df,
     )
 
     # Filter by location: 
-    locations_dict = {
-        'All': 'All Office Locations',
-        'Dt-11': 'Downtown, 11th',
-        'Dt-10': 'Downtown, 10th',
-        # 'Dt-9': 'Downtown Courthouse, 9th floor (COMBAT)',
-        'Dt-7M': 'Downtown, 7M',
-        'Indy': 'East Jack, Independence',
-        'FSD': 'Family Support'
-    }
+    location_choices, location_counts = facet_options["Office Location"]
     location_options = st.selectbox(
         label="**Filter by Office Location:**",
-        options=locations_dict.keys(), # ('Dt-11', 'Dt-10', 'Dt-9', 'Dt-7M', 'Indy', 'FSD')
+        options=location_choices, # ('Dt-11', 'Dt-10', 'Dt-9', 'Dt-7M', 'Indy', 'FSD') -- as present in the data
         index=0, # All
-        format_func=lambda x: locations_dict[x],
+        format_func=format_facet(locations_dict, location_counts),
         key='courtview_selected_location',
         placeholder="Select office location",
         on_change=update_df,
@@ -178,7 +230,7 @@ with st.sidebar:
     logout = st.button(
         label="Logout",
         key="logout",
-        on_click=lambda: st.session_state.clear(), # Clear session state
+        on_click=logout, # Clear session state + session token
         type="secondary",
         icon=":material/logout:"
     )
@@ -196,6 +248,15 @@ with st.sidebar:
         """
     )
 
+    # Query cache counters (admin/diagnostics; enable with [query_cache] show_stats = true in secrets)
+    if st.secrets.get("query_cache", {}).get("show_stats", False):
+        cache_stats = get_query_cache().stats()
+        st.caption(
+            f"Query cache: {cache_stats['hits']} hits / {cache_stats['misses']} misses / {cache_stats['coalesced']} coalesced · "
+            f"{cache_stats['entries']} entries, {cache_stats['bytes'] / 2**20:.1f} of {cache_stats['max_bytes'] / 2**20:.0f} MiB · "
+            f"{cache_stats['evictions']} evictions / {cache_stats['expirations']} expirations / {cache_stats['errors']} errors"
+        )
+
 
 # --- Internal Directory HELPER funcs --- 
 
@@ -267,11 +328,21 @@ def display_attorney(row):
             
             # Headshot Photo (if None, JCPAO logo)
             if row['PhotoID'] is None: 
-                st.image(jcpao_logo, width=400)
+                placeholder_url = logo_assets.url("card")
+                if placeholder_url: # Static, long-cached -- no per-card file read or upload
+                    st.markdown(f"<img src='{placeholder_url}' width='400' style='max-width: 100%;'>", unsafe_allow_html=True)
+                else:
+                    st.image(logo_assets.png["card"], width=400)
             else:
                 headshot_path = "JCPAO_headshots/"+row['PhotoID']
-                attorney_headshot = load_photo(headshot_path)
-                st.image(attorney_headshot, width=400)
+                headshot_version = headshot_versions.get(headshot_path)
+                # Never blocks the script thread: an uncached headshot is fetched in the background, CDN meanwhile
+                local_url = headshot_cache.get_url(headshot_path, headshot_version) if headshot_cache is not None else None
+                if local_url: # Served by this app (static/headshots), long-cached by the browser
+                    st.markdown(f"<img src='{local_url}' width='400' style='max-width: 100%;'>", unsafe_allow_html=True)
+                else:
+                    attorney_headshot = load_photo(headshot_path, headshot_version)
+                    st.image(attorney_headshot, width=400)
 
         with col2:
 
@@ -314,7 +385,7 @@ st.divider()
 
 def main_directory():
 
-    df = st.session_state.get("courtview_filtered_df", apa_data)
+    df = filtered_roster()
 
     # Text search
     searched_text = st.text_input(
@@ -344,10 +415,9 @@ def contact_directory():
     # NO Text Search -- ignore 'searched_text' 
     st.session_state["searched_text"] = ""
 
-    df = st.session_state.get("courtview_filtered_df", apa_data)
+    df = filtered_roster()
 
-    # Reformat df
-    df = df.sort_values(by=['Last Name'])
+    # Reformat df (already sorted by last/first name in the prepared roster)
     attorney_contacts = df[['Full Name','Work Email Address', 'Work Phone #']].copy()
     attorney_contacts['Work Phone #'] = attorney_contacts['Work Phone #'].apply(reformat_phone_num)
     attorney_contacts.rename(columns={
@@ -0,0 +1,79 @@
+"""
+File: facets.py
+Function: Filter option lists + per-option result counts (facets) for the directory sidebar
+Author: Joseph Cho, ujcho@jacksongov.org
+"""
+
+import pandas as pd
+
+
+# --- Facet index ---
+
+class FacetIndex:
+    """
+    Row groupings of a roster by Position / Assigned Unit / Office Location.
+    Built once per data snapshot; every filter change afterwards is set
+    intersection over row positions instead of another pass over the roster.
+    """
+
+    def __init__(self, df: pd.DataFrame, columns: list[str]):
+        self.n_rows = len(df)
+        self.all_rows = frozenset(range(self.n_rows))
+        self.groups = {} # {column: {value: frozenset(row positions)}}
+
+        for column in columns:
+            groups = {}
+            for pos, value in enumerate(df[column].tolist() if column in df else []):
+                values = value if isinstance(value, list) else [value] # 'Assigned Unit' is an enum array
+                for v in values:
+                    if v is None or (isinstance(v, float) and pd.isna(v)):
+                        continue
+                    groups.setdefault(v, set()).add(pos)
+            self.groups[column] = {v: frozenset(rows) for v, rows in groups.items()}
+
+    def rows_for(self, column: str, value) -> frozenset:
+        """Row positions matching a single filter ('All' matches every row)"""
+        if value == 'All':
+            return self.all_rows
+        return self.groups[column].get(value, frozenset())
+
+    def matching_rows(self, selections: dict, exclude: str = None) -> frozenset:
+        """Row positions matching every active filter in {column: value}, optionally ignoring one column"""
+        rows = self.all_rows
+        for column, value in selections.items():
+            if column == exclude or value == 'All':
+                continue
+            rows = rows & self.rows_for(column, value)
+        return rows
+
+    def counts(self, column: str, selections: dict, within: frozenset = None) -> dict:
+        """Cross-filtered counts for each option of one column, given the other active filters (and `within`, e.g. search hits)"""
+        base = self.matching_rows(selections, exclude=column)
+        if within is not None:
+            base = base & within
+        counts = {v: len(rows & base) for v, rows in self.groups[column].items()}
+        counts['All'] = len(base)
+        return counts
+
+    def options(self, column: str, labels: dict, selections: dict, within: frozenset = None) -> tuple[list, dict]:
+        """
+        Return (options, counts) for a selectbox.
+        Options are the values present in the data (known labels first, in label order),
+        with dead-end options (zero rows under the other filters / `within`) dropped.
+        The currently selected value is always kept so the widget stays valid.
+        """
+        counts = self.counts(column, selections, within)
+        present = [v for v in labels if v != 'All' and v in self.groups[column]]
+        present += sorted((v for v in self.groups[column] if v not in labels), key=str)
+
+        selected = selections.get(column, 'All')
+        options = ['All'] + [v for v in present if counts.get(v, 0) > 0 or v == selected]
+        if selected not in options:
+            options.append(selected)
+        return options, counts
+
+
+# Define format_facet()
+def format_facet(labels: dict, counts: dict):
+    """Return a selectbox format_func that shows the label and its result count"""
+    return lambda x: f"{labels.get(x, x)} ({counts.get(x, 0)})"
@@ -0,0 +1,36 @@
+"""
+File: notifications.py
+Function: Non-blocking notifications (toast queue rendered on the next script run)
+Author: Joseph Cho, ujcho@jacksongov.org
+"""
+
+import streamlit as st
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+
+NOTIFICATION_KEY = "_notifications"
+
+NOTIFICATION_ICONS = {
+    "success": ":material/check_circle:",
+    "error": ":material/error:",
+    "warning": ":material/warning:",
+    "info": ":material/info:",
+}
+
+
+# Define notify()
+def notify(message: str, kind: str = "info"):
+    """
+    Queue a toast for the current session (kind: 'success' / 'error' / 'warning' / 'info').
+    Safe to call from widget callbacks -- nothing is rendered (or slept on) here;
+    render_notifications() shows it on the next run and the browser dismisses it.
+    """
+    if get_script_run_ctx(suppress_warning=True) is None: # No session (e.g. a background thread) -- nothing to show it to
+        return
+    st.session_state.setdefault(NOTIFICATION_KEY, []).append((message, kind))
+
+# Define render_notifications()
+def render_notifications():
+    """Show and clear any queued toasts (call once near the top and once at the end of the app script)"""
+    for message, kind in st.session_state.pop(NOTIFICATION_KEY, []):
+        st.toast(message, icon=NOTIFICATION_ICONS.get(kind))
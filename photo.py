@@ -2,31 +2,195 @@ import streamlit as st
 import cloudinary
 from cloudinary import CloudinaryImage
 
-config = cloudinary.config(
-    cloud_name = st.secrets["cloudinary"]["CLOUD_NAME"], 
-    api_key = st.secrets["cloudinary"]["API_KEY"],
-    api_secret = st.secrets["cloudinary"]["API_SECRET"],
-    secure = True
-)
+try:
+    config = cloudinary.config(
+        cloud_name = st.secrets["cloudinary"]["CLOUD_NAME"],
+        api_key = st.secrets["cloudinary"]["API_KEY"],
+        api_secret = st.secrets["cloudinary"]["API_SECRET"],
+        secure = True
+    )
+except Exception: # No Streamlit secrets (e.g. running tools/ scripts) -- falls back to the CLOUDINARY_URL env variable
+    config = cloudinary.config(secure = True)
 
 import cloudinary.uploader
 import cloudinary.api
+from cloudinary.exceptions import Error as CloudinaryError, GeneralError, RateLimited
+import logging
+import tempfile
 import time
-from pathlib import Path 
+from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from PIL import Image, ImageOps
+from sqlalchemy import text
+from sqlalchemy.engine import Engine
 
+from photo_cache import HeadshotCache
 
-# Define load_photo() 
-def load_photo(public_id):
-    """Loads photo from Cloudinary with the provided public ID; returns img src URL that can be read into st.image()/st.markdown()"""
-    return CloudinaryImage(public_id).build_url(version=None)
 
-# TODO - update upload_photo() function and add to special admin function page
-# Define upload_photo()
-def upload_photo():
-    cloudinary.uploader.upload(
-        "path/to/photo.jpg",
-        public_id="pet.dtarantino",
-        overwrite=True,
-        invalidate=True  # invalidates cached version so new image is served
+logger = logging.getLogger(__name__)
+
+HEADSHOT_FOLDER = "JCPAO_headshots"
+IMAGE_SUFFIXES = {".jpg", ".jpeg", ".png", ".webp", ".tif", ".tiff"}
+# Transient upload errors: 5xx, rate limits, network. Network failures and unparseable/unmapped responses
+# surface as the base CloudinaryError; its 4xx subclasses (BadRequest, AuthorizationRequired, ...) are permanent.
+RETRYABLE_ERRORS = (GeneralError, RateLimited, OSError)
+
+
+# Define load_photo()
+def load_photo(public_id, version=None):
+    """Loads photo from Cloudinary with the provided public ID (and version, if known); returns img src URL that can be read into st.image()/st.markdown()"""
+    return CloudinaryImage(public_id).build_url(version=version)
+
+# Define get_headshot_versions()
+def get_headshot_versions() -> dict:
+    """
+    Current Cloudinary version of every headshot, {public_id: version} (Admin API, 500 per call).
+    A re-upload under the same public_id (e.g. bulk_upload_headshots with overwrite=True) gets a new version.
+    Returns {} if the listing fails -- callers then treat versions as unknown.
+    """
+    versions, cursor = {}, None
+    try:
+        while True:
+            page = cloudinary.api.resources(type="upload", prefix=f"{HEADSHOT_FOLDER}/", max_results=500, next_cursor=cursor)
+            versions.update({resource["public_id"]: resource["version"] for resource in page.get("resources", [])})
+            cursor = page.get("next_cursor")
+            if not cursor:
+                return versions
+    except (CloudinaryError, OSError) as e:
+        logger.warning("Headshot version listing failed: %s", e)
+        return {}
+
+# Define get_headshot_cache()
+@st.cache_resource
+def get_headshot_cache() -> HeadshotCache | None:
+    """
+    Local headshot proxy (optional): headshots are fetched once by the server and served from static/headshots,
+    so browsers on networks where the CDN is slow/blocked never hit Cloudinary.
+    Enable with [photos] mode = "proxy" in secrets (optional: max_mb, revalidate_hours); None = serve from the CDN.
+    The cache index is kept in .streamlit/, outside the publicly served static/ directory.
+    """
+    settings = st.secrets.get("photos", {})
+    if settings.get("mode", "cdn") != "proxy":
+        return None
+    return HeadshotCache(
+        root=Path(__file__).parent / "static" / "headshots", # served at app/static/headshots (server.enableStaticServing)
+        index_path=Path(__file__).parent / ".streamlit" / "headshot_index.json",
+        url_for=load_photo,
+        max_bytes=int(settings.get("max_mb", 200)) * 2**20,
+        revalidate_seconds=float(settings.get("revalidate_hours", 24)) * 60 * 60,
     )
-    return True
+
+# Define upload_photo()
+def upload_photo(path, photo_id: str, retries: int = 3, backoff: float = 1.0) -> dict:
+    """
+    Upload one headshot to HEADSHOT_FOLDER/<photo_id>, retrying transient failures with exponential backoff
+    (permanent 4xx errors, e.g. bad credentials, fail immediately).
+    invalidate=True purges only this asset's cached CDN copies so the new image is served.
+    """
+    for attempt in range(retries + 1):
+        try:
+            return cloudinary.uploader.upload(
+                str(path),
+                public_id=f"{HEADSHOT_FOLDER}/{photo_id}",
+                overwrite=True,
+                invalidate=True  # invalidates cached version so new image is served
+            )
+        except (CloudinaryError, OSError) as e:
+            retryable = isinstance(e, RETRYABLE_ERRORS) or type(e) is CloudinaryError
+            if not retryable or attempt == retries:
+                raise
+            time.sleep(backoff * 2 ** attempt)
+
+
+# --- Bulk headshot upload (new attorney classes) ---
+
+# Define preprocess_headshot()
+def preprocess_headshot(src: Path, out_dir: Path, size: int = 800) -> Path:
+    """
+    Square-crop (biased toward the top, where the face is), resize to size x size, and re-encode
+    as JPEG without EXIF/metadata. Top-level function so it can run in a process pool.
+    """
+    with Image.open(src) as img:
+        img = ImageOps.exif_transpose(img) # apply camera rotation before EXIF is dropped
+        img = ImageOps.fit(img.convert("RGB"), (size, size), method=Image.Resampling.LANCZOS, centering=(0.5, 0.35))
+    out_path = Path(out_dir) / f"{Path(src).stem}.jpg"
+    img.save(out_path, "JPEG", quality=85, optimize=True, progressive=True) # no exif= argument -> metadata stripped
+    return out_path
+
+# Define update_photo_ids()
+def update_photo_ids(
+    engine: Engine,
+    photo_ids: dict,
+    table: str = "employee_info",
+    photo_column: str = "photo_id",
+    key_column: str = "work_email",
+) -> int:
+    """
+    Set PhotoID for many employees in one transaction (one executemany batch).
+    `photo_ids` maps key_column value (work email) -> photo_id.
+    Returns the updated row count as reported by the driver (-1 if it can't tell for a batch).
+    With sql/employee_info_notify.sql installed, the commit also refreshes the app's staff snapshot.
+    """
+    if not photo_ids:
+        return 0
+    quote = engine.dialect.identifier_preparer.quote
+    statement = text(f"UPDATE {quote(table)} SET {quote(photo_column)} = :photo_id WHERE {quote(key_column)} = :key")
+    with engine.begin() as conn:
+        result = conn.execute(statement, [{"photo_id": p, "key": k} for k, p in photo_ids.items()])
+    return result.rowcount
+
+# Define bulk_upload_headshots()
+def bulk_upload_headshots(
+    src_dir: Path,
+    engine: Engine = None,
+    email_domain: str = "jacksongov.org",
+    size: int = 800,
+    processes: int = None,
+    max_uploads: int = 4,
+    retries: int = 3,
+    **db_options,
+) -> dict:
+    """
+    Ingest a directory of headshots named after each attorney's work email (e.g. ujcho.jpg -> ujcho@jacksongov.org):
+      1. preprocess (crop/resize/strip EXIF) in a process pool
+      2. upload to Cloudinary with at most `max_uploads` concurrent uploads (+ retries)
+      3. write every PhotoID in one batched database update (skipped if `engine` is None)
+    Files sharing a name (ujcho.jpg + ujcho.png) are reported as failed rather than uploaded over each other.
+    Returns {"uploaded": {email: photo_id}, "failed": {file name: error}, "updated_rows": int}.
+    """
+    sources = sorted(p for p in Path(src_dir).iterdir() if p.suffix.lower() in IMAGE_SUFFIXES)
+    uploaded, failed = {}, {}
+
+    # Same stem (e.g. ujcho.jpg + ujcho.png) = same temp file and public_id -- ambiguous, so none of them is uploaded
+    by_stem = {}
+    for src in sources:
+        by_stem.setdefault(src.stem.lower(), []).append(src)
+    for duplicates in (group for group in by_stem.values() if len(group) > 1):
+        for src in duplicates:
+            failed[src.name] = f"duplicate: {', '.join(p.name for p in duplicates)} map to the same attorney"
+    sources = [src for src in sources if src.name not in failed]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        # 1. CPU-bound image work -> processes
+        with ProcessPoolExecutor(max_workers=processes) as pool:
+            futures = {src: pool.submit(preprocess_headshot, src, Path(tmp), size) for src in sources}
+        prepared = {}
+        for src, future in futures.items():
+            try:
+                prepared[src] = future.result()
+            except Exception as e:
+                failed[src.name] = f"preprocess: {e}"
+
+        # 2. Network-bound uploads -> bounded threads
+        with ThreadPoolExecutor(max_workers=max_uploads) as pool:
+            futures = {src: pool.submit(upload_photo, path, src.stem.lower(), retries) for src, path in prepared.items()}
+        for src, future in futures.items():
+            try:
+                future.result()
+                uploaded[f"{src.stem.lower()}@{email_domain}"] = src.stem.lower()
+            except Exception as e:
+                failed[src.name] = f"upload: {e}"
+
+    # 3. One batched write for all successful uploads
+    updated_rows = update_photo_ids(engine, uploaded, **db_options) if engine is not None else 0
+    return {"uploaded": uploaded, "failed": failed, "updated_rows": updated_rows}
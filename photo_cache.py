@@ -0,0 +1,200 @@
+"""
+File: photo_cache.py
+Function: Local headshot proxy -- size-bounded on-disk LRU cache of Cloudinary headshots, served from the app's static path
+Author: Joseph Cho, ujcho@jacksongov.org
+"""
+
+import hashlib
+import json
+import logging
+import re
+import threading
+import time
+import urllib.error
+import urllib.request
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+# Extensions Streamlit's static file server sends with an image Content-Type
+CONTENT_TYPES = {"image/jpeg": ".jpg", "image/png": ".png", "image/webp": ".webp", "image/gif": ".gif"}
+
+
+# --- Headshot cache ---
+
+class HeadshotCache:
+    """
+    Headshots fetched once from the CDN and stored under `root` (served by Streamlit at `url_prefix`).
+      - files are named <PhotoID>-<content hash>, so a changed photo gets a new URL; URLs carry ?v=<hash>,
+        which makes Streamlit's static handler (Tornado) send long-lived Cache-Control + ETag headers
+      - entries are keyed on PhotoID + upstream (Cloudinary) version when the caller knows it: a re-upload
+        under the same PhotoID has a new version, so the old file is never served for it
+      - entries older than `revalidate_seconds` are re-checked upstream with If-None-Match / If-Modified-Since
+        in the background (the cached file keeps being served meanwhile; a 304 costs no download)
+      - every fetch runs on the background pool, at most one per PhotoID at a time; failures are not retried
+        for `failure_ttl_seconds`
+      - least recently used files are evicted once the cache exceeds `max_bytes`
+    The index lives at `index_path`, which must be outside `root` (everything under root is publicly served).
+    """
+
+    def __init__(self, root: Path, index_path: Path, url_for, url_prefix: str = "app/static/headshots",
+                 max_bytes: int = 200 * 2**20, revalidate_seconds: float = 24 * 60 * 60,
+                 failure_ttl_seconds: float = 5 * 60, timeout: float = 5.0, workers: int = 4):
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        (self.root / "index.json").unlink(missing_ok=True) # index from older versions, publicly served
+        self.url_for = url_for # (PhotoID, upstream version or None) -> upstream (CDN) URL
+        self.url_prefix = url_prefix.rstrip("/")
+        self.max_bytes = max_bytes
+        self.revalidate_seconds = revalidate_seconds
+        self.failure_ttl_seconds = failure_ttl_seconds
+        self.timeout = timeout
+        self._index_path = Path(index_path)
+        self._index_path.parent.mkdir(parents=True, exist_ok=True)
+        self._entries = OrderedDict() # {photo_id: {file, version, upstream_version, etag, last_modified, checked_at, size}}, LRU first
+        self._bytes = 0
+        self._inflight = {} # {photo_id: Future} -- single flight per PhotoID
+        self._failures = {} # {photo_id: time.time() before which no refetch is attempted}
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="headshot-fetch")
+        self._load_index()
+
+    # Public API
+
+    def get_url(self, photo_id: str, version: int | None = None, wait: bool = False) -> str | None:
+        """
+        Local URL for a headshot (at upstream `version`, if given), or None if it isn't cached yet
+        (caller falls back to the CDN URL). On a miss, schedules a background fetch;
+        with `wait`, also blocks on it (never from the script thread -- up to `timeout` per photo).
+        """
+        with self._lock:
+            entry = self._entries.get(photo_id)
+            if entry is not None and self._is_current(entry, version):
+                self._entries.move_to_end(photo_id)
+                if time.time() - entry["checked_at"] > self.revalidate_seconds:
+                    self._schedule(photo_id, version)
+                return self._url(entry)
+            future = self._schedule(photo_id, version)
+
+        if not wait or future is None:
+            return None
+        entry = future.result()
+        return self._url(entry) if entry and self._is_current(entry, version) else None
+
+    def prefetch(self, photo_ids, versions: dict | None = None):
+        """Fetch any uncached (or outdated, per `versions` {PhotoID: upstream version}) headshots in the background"""
+        versions = versions or {}
+        with self._lock:
+            for photo_id in photo_ids:
+                entry = self._entries.get(photo_id)
+                if entry is None or not self._is_current(entry, versions.get(photo_id)):
+                    self._schedule(photo_id, versions.get(photo_id))
+
+    # Internal helpers
+
+    def _url(self, entry: dict) -> str:
+        return f"{self.url_prefix}/{entry['file']}?v={entry['version']}"
+
+    @staticmethod
+    def _is_current(entry: dict, version: int | None) -> bool:
+        """True unless the caller knows a different upstream version than the cached file's"""
+        return version is None or entry.get("upstream_version") == version
+
+    def _schedule(self, photo_id: str, version: int | None = None):
+        """
+        Queue a background fetch/revalidation unless one is already running or the last one failed recently;
+        returns the in-flight Future, or None (call with self._lock held)
+        """
+        if photo_id in self._inflight:
+            return self._inflight[photo_id]
+        if self._failures.get(photo_id, 0) > time.time():
+            return None
+        self._failures.pop(photo_id, None)
+        # Stored before the lock is released, so the worker's cleanup in _fetch always finds it
+        self._inflight[photo_id] = self._executor.submit(self._fetch, photo_id, version)
+        return self._inflight[photo_id]
+
+    def _fetch(self, photo_id: str, version: int | None = None) -> dict | None:
+        """Fetch (or conditionally revalidate) one headshot on the pool; returns its entry, or None on failure"""
+        with self._lock:
+            entry = self._entries.get(photo_id)
+        try:
+            request = urllib.request.Request(self.url_for(photo_id, version))
+            if entry is not None and self._is_current(entry, version): # conditional only for the same upstream version
+                if entry.get("etag"):
+                    request.add_header("If-None-Match", entry["etag"])
+                if entry.get("last_modified"):
+                    request.add_header("If-Modified-Since", entry["last_modified"])
+            try:
+                with urllib.request.urlopen(request, timeout=self.timeout) as response:
+                    content = response.read()
+                    headers = response.headers
+            except urllib.error.HTTPError as e:
+                if e.code == 304 and entry is not None: # Not modified -- keep serving the cached file
+                    with self._lock:
+                        entry["checked_at"] = time.time()
+                        self._failures.pop(photo_id, None)
+                        self._save_index()
+                    return entry
+                raise
+
+            content_hash = hashlib.sha256(content).hexdigest()[:12]
+            suffix = CONTENT_TYPES.get(headers.get_content_type(), ".jpg")
+            file_name = f"{re.sub(r'[^A-Za-z0-9_.-]', '_', photo_id)}-{content_hash}{suffix}"
+            (self.root / file_name).write_bytes(content)
+
+            new_entry = {
+                "file": file_name,
+                "version": content_hash,
+                "upstream_version": version if version is not None else (entry or {}).get("upstream_version"),
+                "etag": headers.get("ETag"),
+                "last_modified": headers.get("Last-Modified"),
+                "checked_at": time.time(),
+                "size": len(content),
+            }
+            with self._lock:
+                old = self._entries.pop(photo_id, None)
+                if old is not None:
+                    self._bytes -= old["size"]
+                    if old["file"] != file_name:
+                        (self.root / old["file"]).unlink(missing_ok=True)
+                self._entries[photo_id] = new_entry
+                self._bytes += new_entry["size"]
+                self._failures.pop(photo_id, None)
+                self._evict()
+                self._save_index()
+            return new_entry
+
+        except (urllib.error.URLError, OSError, ValueError) as e:
+            logger.warning("Headshot fetch failed for %r: %s", photo_id, e)
+            with self._lock: # negative cache -- a missing/unreachable photo isn't refetched on every rerun
+                self._failures[photo_id] = time.time() + self.failure_ttl_seconds
+            return entry # stale copy (if any) is better than none
+        finally:
+            with self._lock:
+                self._inflight.pop(photo_id, None)
+
+    def _evict(self):
+        """Drop least recently used files until under max_bytes (call with self._lock held)"""
+        while self._bytes > self.max_bytes and len(self._entries) > 1:
+            photo_id, entry = self._entries.popitem(last=False)
+            self._bytes -= entry["size"]
+            (self.root / entry["file"]).unlink(missing_ok=True)
+
+    def _load_index(self):
+        try:
+            entries = json.loads(self._index_path.read_text())
+        except (OSError, ValueError):
+            entries = {}
+        for photo_id, entry in entries.items():
+            if (self.root / entry["file"]).exists():
+                self._entries[photo_id] = entry
+                self._bytes += entry["size"]
+
+    def _save_index(self):
+        """Persist the index (call with self._lock held); written on fetch/evict only, never per view"""
+        tmp_path = self._index_path.with_suffix(".tmp")
+        tmp_path.write_text(json.dumps(self._entries))
+        tmp_path.replace(self._index_path)
@@ -0,0 +1,140 @@
+"""
+File: query_cache.py
+Function: Query-result cache for the data layer (LRU by bytes, per-query TTL, single-flight loads, counters)
+Author: Joseph Cho, ujcho@jacksongov.org
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+
+import pandas as pd
+
+
+# --- Query cache ---
+
+class QueryCache:
+    """
+    Caches query results (DataFrames) keyed on (normalized SQL, parameters).
+      - LRU eviction once the cached frames exceed `max_bytes` (sized with memory_usage(deep=True))
+      - per-entry TTL (`ttl` seconds, None = until evicted/invalidated)
+      - single-flight: concurrent misses on the same key share one database query
+    Hits return the cached frame itself (no pickling/copying) -- callers must not modify it in place.
+    """
+
+    def __init__(self, max_bytes: int = 256 * 2**20, default_ttl: float = None):
+        self.max_bytes = max_bytes
+        self.default_ttl = default_ttl
+        self._entries = OrderedDict() # {key: (df, nbytes, expires_at)}, least recently used first
+        self._inflight = {} # {key: Future}
+        self._bytes = 0
+        self._epoch = 0 # bumped by invalidate(): loads started before it are not stored
+        self._lock = threading.Lock()
+        self.counters = {"hits": 0, "misses": 0, "coalesced": 0, "evictions": 0, "expirations": 0, "errors": 0}
+
+    @staticmethod
+    def make_key(sql_query: str, params=None) -> tuple:
+        """Whitespace-insensitive SQL + hashable parameters (list/array values, e.g. for ANY(:ids), become tuples)"""
+        return (" ".join(sql_query.split()), None if params is None else QueryCache._freeze(params))
+
+    @staticmethod
+    def _freeze(value):
+        """Hashable, order-stable form of a parameter value; TypeError names the offending value otherwise"""
+        if isinstance(value, dict):
+            return tuple(sorted((k, QueryCache._freeze(v)) for k, v in value.items()))
+        if isinstance(value, (list, tuple)):
+            return tuple(QueryCache._freeze(v) for v in value)
+        if isinstance(value, (set, frozenset)):
+            return frozenset(QueryCache._freeze(v) for v in value)
+        if hasattr(value, "tolist") and not isinstance(value, (str, bytes)): # numpy arrays/scalars, pandas Series/Index
+            return QueryCache._freeze(value.tolist())
+        try:
+            hash(value)
+        except TypeError:
+            raise TypeError(f"Query parameter {value!r} ({type(value).__name__}) can't be used as a cache key") from None
+        return value
+
+    def get_or_load(self, sql_query: str, loader, params=None, ttl: float = None) -> pd.DataFrame:
+        """Return the cached result for (sql_query, params), or run `loader()` once for all concurrent callers"""
+        key = self.make_key(sql_query, params)
+        now = time.monotonic()
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry[2] is None or entry[2] > now:
+                    self._entries.move_to_end(key)
+                    self.counters["hits"] += 1
+                    return entry[0]
+                self._remove(key)
+                self.counters["expirations"] += 1
+
+            future = self._inflight.get(key)
+            if future is not None: # Someone else is already querying this -- wait for their result
+                self.counters["coalesced"] += 1
+                leader = False
+            else:
+                future = self._inflight[key] = Future()
+                self.counters["misses"] += 1
+                epoch = self._epoch
+                leader = True
+
+        if not leader:
+            return future.result()
+
+        try:
+            df = loader()
+        except BaseException as e:
+            with self._lock:
+                self._inflight.pop(key, None)
+                self.counters["errors"] += 1
+            future.set_exception(e) # Errors are shared with waiters but never cached
+            raise
+
+        ttl = self.default_ttl if ttl is None else ttl
+        with self._lock:
+            self._inflight.pop(key, None)
+            if epoch == self._epoch:
+                self._store(key, df, None if ttl is None else time.monotonic() + ttl)
+        future.set_result(df)
+        return df
+
+    def invalidate(self, sql_query: str = None, params=None):
+        """Drop one query (all parameter variants if `params` is None), or everything if `sql_query` is None"""
+        with self._lock:
+            self._epoch += 1
+            if sql_query is None:
+                keys = list(self._entries)
+            elif params is None:
+                normalized = self.make_key(sql_query)[0]
+                keys = [k for k in self._entries if k[0] == normalized]
+            else:
+                keys = [self.make_key(sql_query, params)]
+            for key in keys:
+                self._remove(key)
+
+    def stats(self) -> dict:
+        """Counters plus current size"""
+        with self._lock:
+            return {**self.counters, "entries": len(self._entries), "bytes": self._bytes, "max_bytes": self.max_bytes}
+
+    # Internal helpers (call with self._lock held)
+
+    def _store(self, key: tuple, df: pd.DataFrame, expires_at: float):
+        nbytes = int(df.memory_usage(deep=True).sum())
+        if key in self._entries:
+            self._remove(key)
+        if nbytes > self.max_bytes: # Larger than the whole cache -- serve it, don't keep it
+            self.counters["evictions"] += 1
+            return
+        self._entries[key] = (df, nbytes, expires_at)
+        self._bytes += nbytes
+        while self._bytes > self.max_bytes:
+            oldest = next(iter(self._entries))
+            self._remove(oldest)
+            self.counters["evictions"] += 1
+
+    def _remove(self, key: tuple):
+        df, nbytes, expires_at = self._entries.pop(key)
+        self._bytes -= nbytes
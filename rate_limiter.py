@@ -0,0 +1,78 @@
+"""
+File: rate_limiter.py
+Function: Brute-force protection for the verification portal (token bucket per email / client IP)
+Author: Joseph Cho, ujcho@jacksongov.org
+"""
+
+import shelve
+import threading
+import time
+
+
+# --- Token bucket limiter ---
+
+class LoginRateLimiter:
+    """
+    In-memory token bucket keyed by an arbitrary string (email address, client IP, ...).
+    Each failed attempt spends one token; tokens refill at one per `refill_seconds`
+    up to `capacity`. A key with no tokens left is locked out until the next refill.
+    Every check/update is O(1) and never sleeps.
+    Optionally persisted to a shelve file so lockouts survive an app restart.
+    """
+
+    def __init__(self, capacity: int = 5, refill_seconds: float = 60.0, persist_path: str = None, max_keys: int = 10_000):
+        self.capacity = capacity
+        self.refill_seconds = refill_seconds
+        self.max_keys = max_keys
+        self._buckets = {} # {key: (tokens, last_update)}
+        self._lock = threading.Lock()
+        self._store = None
+
+        if persist_path:
+            self._store = shelve.open(persist_path)
+            now = time.time()
+            for key, (tokens, updated) in self._store.items():
+                tokens = self._refill(tokens, updated, now)
+                if tokens < self.capacity:
+                    self._buckets[key] = (tokens, now)
+
+    def _refill(self, tokens: float, updated: float, now: float) -> float:
+        return min(self.capacity, tokens + (now - updated) / self.refill_seconds)
+
+    def _tokens(self, key: str, now: float) -> float:
+        tokens, updated = self._buckets.get(key, (self.capacity, now))
+        return self._refill(tokens, updated, now)
+
+    def retry_after(self, key: str) -> float:
+        """Seconds until `key` may attempt again (0 if allowed now)"""
+        with self._lock:
+            tokens = self._tokens(key, time.time())
+        return 0.0 if tokens >= 1 else (1 - tokens) * self.refill_seconds
+
+    def record_failure(self, key: str):
+        """Spend one token for a failed attempt"""
+        now = time.time()
+        with self._lock:
+            tokens = max(0.0, self._tokens(key, now) - 1)
+            if key not in self._buckets and len(self._buckets) >= self.max_keys:
+                self._evict(now)
+            self._buckets[key] = (tokens, now)
+            if self._store is not None:
+                self._store[key] = (tokens, now)
+                self._store.sync()
+
+    def reset(self, key: str):
+        """Forget `key` (e.g. after a successful verification)"""
+        with self._lock:
+            self._buckets.pop(key, None)
+            if self._store is not None and key in self._store:
+                del self._store[key]
+                self._store.sync()
+
+    def _evict(self, now: float):
+        """Drop buckets that have fully refilled; if none, drop the oldest (bounds memory under a spray of keys)"""
+        full = [k for k, (t, u) in self._buckets.items() if self._refill(t, u, now) >= self.capacity]
+        for key in full or [min(self._buckets, key=lambda k: self._buckets[k][1])]:
+            self._buckets.pop(key, None)
+            if self._store is not None and key in self._store:
+                del self._store[key]
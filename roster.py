@@ -0,0 +1,102 @@
+"""
+File: roster.py
+Function: Prepared (filtered + sorted + indexed) court-view roster, built once per data snapshot
+Author: Joseph Cho, ujcho@jacksongov.org
+"""
+
+import threading
+from collections import OrderedDict
+
+import pandas as pd
+
+from facets import FacetIndex
+
+
+# Positions shown in the court view
+COURT_POSITIONS = ['Exec', 'CTA', 'TTL', 'APA']
+
+# Columns searched by the name search box
+SEARCH_COLUMNS = ["Full Name", "First Name", "Middle Name", "Last Name", "Suffix", "Preferred Name"]
+
+# Sidebar facet results kept per snapshot, one per (filters, search) combination
+FACET_CACHE_SIZE = 256
+
+
+# --- Prepared roster ---
+
+class PreparedRoster:
+    """
+    Court-view roster for one STAFF_VIEW snapshot: filtered to COURT_POSITIONS, sorted by
+    (case-insensitive) last/first name, with facet groupings and a lowercase search string per row.
+    Shared across sessions -- treat `df` as read-only (filter with `rows()`, never modify in place).
+    """
+
+    def __init__(self, version: int, staff_view: pd.DataFrame, facet_columns: list[str]):
+        self.version = version
+
+        df = staff_view.loc[staff_view["Position"].isin(COURT_POSITIONS)] if not staff_view.empty else staff_view
+
+        # Precomputed case-insensitive sort keys
+        self.sort_keys = pd.DataFrame({
+            "last": df["Last Name"].fillna("").str.strip().str.casefold(),
+            "first": df["First Name"].fillna("").str.strip().str.casefold(),
+        }) if not df.empty else pd.DataFrame(columns=["last", "first"])
+        order = self.sort_keys.sort_values(by=["last", "first"], kind="stable").index
+        self.sort_keys = self.sort_keys.loc[order].reset_index(drop=True)
+        self.df = df.loc[order].reset_index(drop=True)
+
+        # Row groupings for the sidebar filters
+        self.facets = FacetIndex(self.df, facet_columns)
+
+        # Lowercase searchable text per row (replaces the per-search join over SEARCH_COLUMNS)
+        self.search_text = (
+            self.df[SEARCH_COLUMNS].fillna("").astype(str).agg(" ".join, axis=1).str.lower().tolist()
+            if not self.df.empty else []
+        )
+
+        self._facet_cache = OrderedDict() # {(selections, search words): {column: (options, counts)}}, LRU first
+        self._facet_lock = threading.Lock()
+
+    @staticmethod
+    def search_words(searched_text: str) -> tuple:
+        """Unique lowercase words of the search text (sorted, so equivalent searches share cache entries)"""
+        return tuple(sorted({w for w in searched_text.strip().lower().split() if w}))
+
+    def search_rows(self, searched_text: str = "") -> frozenset:
+        """Row positions matching ANY word of the search text (every row if there is none)"""
+        words = self.search_words(searched_text)
+        if not words:
+            return self.facets.all_rows
+        return frozenset(i for i, text in enumerate(self.search_text) if any(word in text for word in words))
+
+    def rows(self, selections: dict, searched_text: str = "") -> list[int]:
+        """Row positions (in roster order) matching the sidebar filters and ANY word of the search text"""
+        return sorted(self.facets.matching_rows(selections) & self.search_rows(searched_text))
+
+    def facet_options(self, labels: dict, selections: dict, searched_text: str = "") -> dict:
+        """
+        {column: (options, counts)} for every sidebar filter (`labels` = {column: label dict}, constant per app),
+        counted under the other filters and the search. Cached per (selections, search) for this snapshot,
+        so reruns that change nothing -- and revisited combinations -- skip the set intersections.
+        """
+        key = (tuple(sorted(selections.items(), key=str)), self.search_words(searched_text))
+        with self._facet_lock:
+            cached = self._facet_cache.get(key)
+            if cached is not None:
+                self._facet_cache.move_to_end(key)
+                return cached
+
+        within = self.search_rows(searched_text) if key[1] else None
+        result = {column: self.facets.options(column, labels[column], selections, within) for column in labels}
+        with self._facet_lock:
+            self._facet_cache[key] = result
+            while len(self._facet_cache) > FACET_CACHE_SIZE:
+                self._facet_cache.popitem(last=False)
+        return result
+
+    def filter(self, selections: dict, searched_text: str = "") -> pd.DataFrame:
+        """Filtered copy of the roster (only the matching rows are copied; no filters returns the shared frame)"""
+        rows = self.rows(selections, searched_text)
+        if len(rows) == len(self.df):
+            return self.df
+        return self.df.iloc[rows].reset_index(drop=True)
@@ -0,0 +1,60 @@
+"""
+File: session_token.py
+Function: Signed, expiring session tokens so verified users can skip the portal on refresh/reconnect
+Author: Joseph Cho, ujcho@jacksongov.org
+"""
+
+import base64
+import hashlib
+import hmac
+import time
+
+
+# --- Helpers ---
+
+def _b64encode(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).decode().rstrip("=")
+
+def _b64decode(data: str) -> bytes:
+    return base64.urlsafe_b64decode(data + "=" * (-len(data) % 4))
+
+def _sign(payload: str, secret: str) -> str:
+    return _b64encode(hmac.new(secret.encode(), payload.encode(), hashlib.sha256).digest())
+
+
+# --- Issue / validate tokens ---
+
+# Define issue_token()
+def issue_token(email: str, secret: str, ttl_seconds: int = 12 * 60 * 60) -> str:
+    """Return a token '<payload>.<signature>' binding `email` to an expiry time (validated locally, no database)"""
+    payload = _b64encode(f"{email}|{int(time.time()) + ttl_seconds}".encode())
+    return f"{payload}.{_sign(payload, secret)}"
+
+# Define verify_token()
+def verify_token(token: str, secret: str) -> str | None:
+    """Return the verified email if `token` is authentic and unexpired, otherwise None"""
+    try:
+        payload, signature = token.split(".", 1)
+        # Compare bytes: compare_digest raises TypeError on non-ASCII str (tokens come straight from the URL)
+        if not hmac.compare_digest(signature.encode(), _sign(payload, secret).encode()):
+            return None
+        email, expires = _b64decode(payload).decode().rsplit("|", 1)
+        if int(expires) < time.time():
+            return None
+        return email
+    except (ValueError, UnicodeDecodeError):
+        return None
+
+
+# --- Self-check (untrusted input from the URL): python session_token.py ---
+
+if __name__ == "__main__":
+    secret = "x" * 32
+    token = issue_token("ujcho@jacksongov.org", secret)
+    payload, signature = token.split(".", 1)
+    assert verify_token(token, secret) == "ujcho@jacksongov.org"
+    for bad in ["", ".", "no-dot", "YQ.\u00e9", "\u00e9.\u00e9", f"{payload}.{signature[:-1]}{'B' if signature[-1] == 'A' else 'A'}", f"{payload}x.{signature}",
+                token + "\u00e9", issue_token("a@b", secret, ttl_seconds=-1)]:
+        assert verify_token(bad, secret) is None, bad
+    assert verify_token(token, "y" * 32) is None
+    print("session_token: ok")
@@ -0,0 +1,55 @@
+-- File: sql/employee_info_notify.sql
+-- Function: NOTIFY a channel (default 'employee_info_changed') whenever a table behind employee_info_view changes
+--           (consumed by change_listener.py -- the app reloads its STAFF_VIEW snapshot)
+-- Usage (psql; the channel must match [neonDB] notify_channel in secrets, if set):
+--     psql "$DATABASE_URL" -f sql/employee_info_notify.sql
+--     psql "$DATABASE_URL" -v channel=my_channel -f sql/employee_info_notify.sql
+-- Re-run after changing the view definition (or a view it reads from) so triggers cover any newly referenced tables.
+
+\if :{?channel}
+\else
+    \set channel employee_info_changed
+\endif
+SELECT set_config('jcpao.notify_channel', :'channel', false); -- psql variables aren't expanded inside $$ bodies
+
+CREATE OR REPLACE FUNCTION notify_employee_info_changed() RETURNS trigger AS $$
+BEGIN
+    -- One notification per statement on the channel given as the trigger argument; payload = table name.
+    -- Identical payloads within a transaction are collapsed by Postgres, and the listener debounces bursts across transactions.
+    PERFORM pg_notify(TG_ARGV[0], TG_TABLE_NAME);
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Attach a statement-level trigger to every table the view reads from, directly or through nested views
+-- (resolved recursively via pg_depend; information_schema.view_table_usage only lists direct dependencies)
+DO $$
+DECLARE
+    t record;
+BEGIN
+    FOR t IN
+        WITH RECURSIVE deps(oid) AS (
+            SELECT 'employee_info_view'::regclass::oid
+            UNION
+            SELECT d.refobjid
+            FROM deps
+            JOIN pg_rewrite r ON r.ev_class = deps.oid
+            JOIN pg_depend d ON d.classid = 'pg_rewrite'::regclass AND d.objid = r.oid
+                            AND d.refclassid = 'pg_class'::regclass AND d.refobjid <> deps.oid
+        )
+        SELECT DISTINCT n.nspname AS table_schema, c.relname AS table_name
+        FROM deps
+        JOIN pg_class c ON c.oid = deps.oid
+        JOIN pg_namespace n ON n.oid = c.relnamespace
+        WHERE c.relkind IN ('r', 'p') -- tables and partitioned tables (not views)
+    LOOP
+        EXECUTE format('DROP TRIGGER IF EXISTS employee_info_notify ON %I.%I', t.table_schema, t.table_name);
+        EXECUTE format(
+            'CREATE TRIGGER employee_info_notify
+                AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON %I.%I
+                FOR EACH STATEMENT EXECUTE FUNCTION notify_employee_info_changed(%L)',
+            t.table_schema, t.table_name, current_setting('jcpao.notify_channel')
+        );
+    END LOOP;
+END;
+$$;
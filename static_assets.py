@@ -0,0 +1,78 @@
+"""
+File: static_assets.py
+Function: Static asset pipeline -- logo variants precomputed once at startup and served from memory / the static path
+Author: Joseph Cho, ujcho@jacksongov.org
+"""
+
+import base64
+import hashlib
+import io
+import logging
+from pathlib import Path
+
+import streamlit as st
+from PIL import Image
+
+logger = logging.getLogger(__name__)
+
+LOGO_SOURCE = Path(__file__).parent / "assets" / "logo" / "jcpao_logo_750x750.png"
+STATIC_DIR = Path(__file__).parent / "static" / "logo" # served at app/static/logo (server.enableStaticServing)
+STATIC_URL = "app/static/logo"
+
+# Pixel size of each variant: 2x the displayed size (HiDPI), except the card placeholder
+LOGO_VARIANTS = {
+    "icon": 64, # browser tab (page_icon), shown at 32 px
+    "sidebar": 128, # st.logo, shown at up to 64 px
+    "portal": 400, # verification portal, shown at 200 px
+    "card": 400, # placeholder for attorneys without a headshot, shown at up to 400 px -- 1x, it repeats down the
+                 # directory so bytes matter more than HiDPI sharpness (was the full 500x500 PNG); same file as portal
+}
+
+
+# --- Logo assets ---
+
+class LogoAssets:
+    """
+    Resized, palette-optimized PNG bytes for every LOGO_VARIANTS entry, plus:
+      - url(name): static URL with ?v=<hash> (long-cached by the browser), or None if static/ isn't writable
+      - data_uri[name]: base64 data URI, encoded once here -- fallback for custom HTML when url() is None
+    """
+
+    def __init__(self, source: Path = LOGO_SOURCE, static_dir: Path = STATIC_DIR):
+        self.png = {}
+        self._urls = {}
+        rendered = {} # {size: bytes} -- variants sharing a size are rendered once
+
+        with Image.open(source) as logo:
+            logo = logo.convert("RGBA")
+            for name, size in LOGO_VARIANTS.items():
+                if size not in rendered:
+                    buffer = io.BytesIO()
+                    resized = logo.resize((size, size), Image.Resampling.LANCZOS)
+                    # 256-color palette (keeps alpha): ~5x smaller than full-color PNG, no visible loss on the logo
+                    resized.quantize(256, method=Image.Quantize.FASTOCTREE).save(buffer, "PNG", optimize=True)
+                    rendered[size] = buffer.getvalue()
+                self.png[name] = rendered[size]
+
+        self.data_uri = {name: f"data:image/png;base64,{base64.b64encode(data).decode()}" for name, data in self.png.items()}
+
+        for size, data in rendered.items():
+            version = hashlib.sha256(data).hexdigest()[:12]
+            file_name = f"jcpao_logo_{size}x{size}-{version}.png"
+            try:
+                static_dir.mkdir(parents=True, exist_ok=True)
+                if not (static_dir / file_name).exists():
+                    (static_dir / file_name).write_bytes(data)
+                self._urls[size] = f"{STATIC_URL}/{file_name}?v={version}"
+            except OSError as e:
+                logger.warning("Static logo variant not written (%s); serving from memory instead", e)
+
+    def url(self, name: str) -> str | None:
+        return self._urls.get(LOGO_VARIANTS[name])
+
+
+# Define get_logo_assets()
+@st.cache_resource(show_spinner=False)
+def get_logo_assets() -> LogoAssets:
+    """Build the logo variants once per server process (shared across sessions)"""
+    return LogoAssets()
@@ -1,17 +1,23 @@
 import streamlit as st
-from pathlib import Path
-import time
-import base64
+import hmac
+import logging
+import secrets
 
+from static_assets import get_logo_assets
 from connect_data2 import log_user
+from notifications import notify, render_notifications
+from rate_limiter import LoginRateLimiter
+from session_token import issue_token, verify_token
+
+logger = logging.getLogger(__name__)
 
 # --- Configure Streamlit page settings --- 
 
-jcpao_logo = Path("assets/logo/jcpao_logo_500x500.png")
+logo_assets = get_logo_assets() # Logo variants precomputed once per server process (see static_assets.py)
 
 st.set_page_config(
     page_title="JCPAO Court Directory", # court-view only
-    page_icon=jcpao_logo, # cloudinary.CloudinaryImage('jcpao_logo_200x200').build_url()
+    page_icon=logo_assets.png["icon"], # cloudinary.CloudinaryImage('jcpao_logo_200x200').build_url()
     layout="wide", # "centered" or "wide"
     initial_sidebar_state="auto", # "expanded" / "auto" / "collapsed"
     menu_items={
@@ -22,12 +28,66 @@ st.set_page_config(
 )
 
 # --- JCPAO Streamlit page logo ---
-st.logo(jcpao_logo, size="large", link="https://www.jacksoncountyprosecutor.com")
+st.logo(logo_assets.png["sidebar"], size="large", link="https://www.jacksoncountyprosecutor.com")
+
+# --- Brute-force protection (shared across sessions) ---
+
+@st.cache_resource
+def get_rate_limiters() -> dict:
+    """Token-bucket limiters for failed verification attempts, keyed by email and by client IP"""
+    settings = st.secrets.get("rate_limit", {})
+    persist_path = settings.get("persist_path") # optional, e.g. ".streamlit/rate_limit.db"
+    return {
+        "email": LoginRateLimiter(
+            capacity=settings.get("email_attempts", 5),
+            refill_seconds=settings.get("email_refill_seconds", 60),
+            persist_path=f"{persist_path}.email" if persist_path else None,
+        ),
+        "ip": LoginRateLimiter(
+            capacity=settings.get("ip_attempts", 20),
+            refill_seconds=settings.get("ip_refill_seconds", 15),
+            persist_path=f"{persist_path}.ip" if persist_path else None,
+        ),
+        # One shared bucket for clients whose address is unknown (no IP, no X-Forwarded-For) -- larger, but it
+        # still caps guessing across rotated emails
+        "unknown": LoginRateLimiter(
+            capacity=settings.get("unknown_attempts", 100),
+            refill_seconds=settings.get("unknown_refill_seconds", 6),
+            persist_path=f"{persist_path}.unknown" if persist_path else None,
+        ),
+    }
 
-@st.cache_data
-def get_logo_base64(path: Path) -> str:
-    """Base64-encode the logo so it can be centered via custom HTML."""
-    return base64.b64encode(path.read_bytes()).decode()
+def client_key() -> tuple[str, str]:
+    """(limiter name, key) for the client: its IP, else the address a same-host reverse proxy forwarded, else the shared bucket"""
+    if st.context.ip_address:
+        return "ip", st.context.ip_address
+    forwarded = st.context.headers.get("X-Forwarded-For", "")
+    if forwarded.strip(): # Rightmost entry = the address our proxy saw (entries left of it are client-supplied, spoofable)
+        return "ip", forwarded.split(",")[-1].strip()
+    return "unknown", "unknown"
+
+# --- Session tokens (skip the portal on refresh/reconnect) ---
+
+# NOTE: ?session=<token> is a bearer credential -- anyone with the page URL (shared link, browser history)
+# is logged in until the token expires (ttl_seconds, default 12 hours)
+SESSION_PARAM = "session"
+
+@st.cache_resource
+def get_session_secret() -> str:
+    """
+    Signing key for session tokens: [session] signing_key in secrets (high-entropy, e.g. `python -c "import secrets; print(secrets.token_urlsafe(32))"`).
+    Never derived from the security code -- tokens sit in the URL, and a short code could be brute-forced offline from one token.
+    If missing/too short, a random per-process key is used (tokens then stop working after a server restart).
+    Rotate signing_key to revoke every outstanding token.
+    """
+    signing_key = st.secrets.get("session", {}).get("signing_key", "")
+    if len(signing_key) >= 32:
+        return signing_key
+    logger.warning("[session] signing_key missing or shorter than 32 characters; using a random per-process key")
+    return secrets.token_urlsafe(32)
+
+def get_session_ttl() -> int:
+    return int(st.secrets.get("session", {}).get("ttl_seconds", 12 * 60 * 60)) # default: 12 hours
 
 # --- Connect to database ---
 
@@ -35,6 +95,15 @@ def get_logo_base64(path: Path) -> str:
 if "verified" not in st.session_state:
     st.session_state["verified"] = False
 
+# Restore a verified session from its signed token (validated locally -- no portal, no database round trip)
+if not st.session_state["verified"] and SESSION_PARAM in st.query_params:
+    restored_email = verify_token(st.query_params[SESSION_PARAM], get_session_secret())
+    if restored_email:
+        st.session_state["verified_email"] = restored_email
+        st.session_state["verified"] = True
+    else: # Expired or tampered
+        del st.query_params[SESSION_PARAM]
+
 # st.write(st.session_state)
 
 # --- Initialize callback functions --- 
@@ -43,23 +112,33 @@ def verify_attempt():
     """Verify form submission"""
 
     # Variables
-    email = st.session_state["verified_email"]
+    email = st.session_state["verified_email"].strip().lower()
     code = st.session_state["security_code"]
     security_code = st.secrets["security_codes"]["court"]
 
+    # Rate limit by email and by client IP (no sleeping -- a locked-out attempt is rejected immediately)
+    limiters = get_rate_limiters()
+    client_limiter, client = client_key()
+    keys = {"email": email, client_limiter: client}
+    retry_after = max(limiters[name].retry_after(key) for name, key in keys.items())
+    if retry_after > 0:
+        notify(f"Too many failed attempts. Please wait {int(retry_after) + 1} seconds and try again.", "error")
+        return
+
     # Check verification
     # TODO - add security of checking if the @jacksongov.org email actually exists/is active in the database prior to verification
-    
-    if (email.endswith("@courts.mo.gov") or email.endswith("@jacksongov.org")) and code == security_code:
+    valid_code = hmac.compare_digest(code.encode(), security_code.encode()) # constant-time comparison
+
+    if (email.endswith("@courts.mo.gov") or email.endswith("@jacksongov.org")) and valid_code:
+        limiters["email"].reset(email)
         log_user(email) # also track ip address? [st.context.ip_address]
-        success_message = st.success(f"Verification successful: *{st.session_state['verified_email']}*")
-        time.sleep(2)
-        success_message.empty()
+        notify(f"Verification successful: *{st.session_state['verified_email']}*", "success")
         st.session_state["verified"] = True # Unlocks directory
+        st.query_params[SESSION_PARAM] = issue_token(email, get_session_secret(), get_session_ttl())
     else:
-        fail_message = st.error("Failed to verify user. Please try again with an authorized email and security code.")
-        time.sleep(2)
-        fail_message.empty()
+        for name, key in keys.items():
+            limiters[name].record_failure(key)
+        notify("Failed to verify user. Please try again with an authorized email and security code.", "error")
 
 # --- Enter security code --- 
 
@@ -92,7 +171,7 @@ def display_portal():
         st.markdown(
             f"""
             <div style='text-align: center; margin-bottom: 36px;'>
-                <img src='data:image/png;base64,{get_logo_base64(jcpao_logo)}' width='200'>
+                <img src='{logo_assets.url("portal") or logo_assets.data_uri["portal"]}' width='200'>
             </div>
             """,
             unsafe_allow_html=True
@@ -144,6 +223,8 @@ def display_portal():
 
 # --- RUN STREAMLIT APP --- 
 
+render_notifications() # Toasts queued by callbacks (e.g. verify_attempt)
+
 if not st.session_state["verified"]:
     display_portal() # Display verification portal
 
@@ -158,4 +239,6 @@ else: # st.session_state["verified"] == TRUE
     ]
 
     court_pg = st.navigation(directory_pages, position="top")
-    court_pg.run() 
\ No newline at end of file
+    court_pg.run()
+
+render_notifications() # Toasts queued while the page ran (e.g. log_user errors)
@@ -0,0 +1,77 @@
+"""
+File: tools/bench_assets.py
+Function: Benchmark -- startup cost of the precomputed logo variants (static_assets.py) vs. the per-render cost they replace
+Author: Joseph Cho, ujcho@jacksongov.org
+
+Usage (from the repo root):
+    python tools/bench_assets.py --renders 200
+"""
+
+import argparse
+import base64
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import streamlit as st
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(REPO_ROOT))
+
+from static_assets import LOGO_SOURCE, LogoAssets # noqa: E402
+
+OLD_LOGO = REPO_ROOT / "assets" / "logo" / "jcpao_logo_500x500.png"
+
+
+# Replaced code, as it was: the portal logo went through st.cache_data (hit = hash the argument + unpickle a copy)
+@st.cache_data
+def get_logo_base64(path: Path) -> str:
+    return base64.b64encode(path.read_bytes()).decode()
+
+
+def time_it(func, repeat: int) -> float:
+    """Median seconds per call"""
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    return statistics.median(times)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--renders", type=int, default=200, help="calls timed per render path")
+    parser.add_argument("--startups", type=int, default=5, help="times the variants are rebuilt")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        startup = time_it(lambda: LogoAssets(LOGO_SOURCE, Path(tmp)), args.startups)
+        assets = LogoAssets(LOGO_SOURCE, Path(tmp))
+
+    # Old hot path: card placeholder re-read from disk (st.image) for every attorney without a photo;
+    # portal logo from the st.cache_data'd base64 of the 500x500 PNG (warm cache)
+    old_card = time_it(lambda: OLD_LOGO.read_bytes(), args.renders)
+    old_portal_html = get_logo_base64(OLD_LOGO)
+    old_portal = time_it(lambda: get_logo_base64(OLD_LOGO), args.renders)
+    # New hot path: in-memory lookups of static URLs (bytes / data URI only if static/ isn't writable)
+    new_card = time_it(lambda: assets.url("card") or assets.png["card"], args.renders)
+    new_portal_html = assets.url("portal") or assets.data_uri["portal"]
+    new_portal = time_it(lambda: assets.url("portal") or assets.data_uri["portal"], args.renders)
+
+    old_size = OLD_LOGO.stat().st_size
+    print(f"Startup (build all variants): {startup * 1e3:.1f} ms (median of {args.startups})")
+    print(f"{'':<30}{'old':>14}{'new':>14}")
+    print(f"{'card placeholder / render':<30}{old_card * 1e6:>11.1f} us{new_card * 1e6:>11.1f} us")
+    print(f"{'portal logo / render':<30}{old_portal * 1e6:>11.1f} us{new_portal * 1e6:>11.1f} us")
+    print(f"{'card placeholder file bytes':<30}{old_size:>14,}{len(assets.png['card']):>14,}")
+    print(f"{'portal logo inlined per render':<30}{len(old_portal_html):>14,}{len(new_portal_html):>14,}")
+    print(f"{'portal logo file bytes':<30}{old_size:>14,}{len(assets.png['portal']):>14,}")
+    for name, data in assets.png.items():
+        print(f"  variant {name:<8} {len(data):>10,} bytes")
+
+
+if __name__ == "__main__":
+    main()
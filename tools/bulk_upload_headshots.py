@@ -0,0 +1,75 @@
+"""
+File: tools/bulk_upload_headshots.py
+Function: Bulk headshot ingestion for new attorney classes (see photo.bulk_upload_headshots)
+Author: Joseph Cho, ujcho@jacksongov.org
+
+Images must be named after each attorney's work email (ujcho.jpg -> ujcho@jacksongov.org).
+Cloudinary credentials come from .streamlit/secrets.toml or the CLOUDINARY_URL env variable;
+the database URL from --database-url or [neonDB] database_url in secrets.
+
+Usage (from the repo root):
+    python tools/bulk_upload_headshots.py path/to/new_class/
+    python tools/bulk_upload_headshots.py path/to/new_class/ --upload-prefix http://127.0.0.1:8765 --dry-run  # offline, with tools/cloudinary_stub.py
+"""
+
+import argparse
+import os
+import sys
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(REPO_ROOT))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("src_dir", type=Path, help="directory of headshot images")
+    parser.add_argument("--database-url", default=None, help="SQLAlchemy URL (default: [neonDB] database_url in secrets)")
+    parser.add_argument("--dry-run", action="store_true", help="preprocess + upload only, skip the database update")
+    parser.add_argument("--upload-prefix", default=None, help="alternate upload API root, e.g. the local stub http://127.0.0.1:8765")
+    parser.add_argument("--email-domain", default="jacksongov.org")
+    parser.add_argument("--size", type=int, default=800, help="square output size in pixels")
+    parser.add_argument("--processes", type=int, default=None, help="preprocessing processes (default: CPU count)")
+    parser.add_argument("--max-uploads", type=int, default=4, help="concurrent uploads")
+    parser.add_argument("--retries", type=int, default=3)
+    parser.add_argument("--table", default="employee_info", help="table holding the PhotoID column")
+    parser.add_argument("--photo-column", default="photo_id")
+    parser.add_argument("--key-column", default="work_email")
+    args = parser.parse_args()
+
+    os.chdir(REPO_ROOT) # st.secrets reads .streamlit/secrets.toml relative to the working directory
+    import cloudinary
+    import photo
+
+    if args.upload_prefix:
+        cloudinary.config(upload_prefix=args.upload_prefix)
+        if not cloudinary.config().cloud_name: # the stub accepts any credentials
+            cloudinary.config(cloud_name="stub", api_key="stub", api_secret="stub")
+
+    engine = None
+    if not args.dry_run:
+        import streamlit as st
+        from sqlalchemy import create_engine
+        engine = create_engine(args.database_url or st.secrets["neonDB"]["database_url"])
+
+    results = photo.bulk_upload_headshots(
+        args.src_dir.resolve(),
+        engine=engine,
+        email_domain=args.email_domain,
+        size=args.size,
+        processes=args.processes,
+        max_uploads=args.max_uploads,
+        retries=args.retries,
+        table=args.table,
+        photo_column=args.photo_column,
+        key_column=args.key_column,
+    )
+
+    print(f"Uploaded: {len(results['uploaded'])} | failed: {len(results['failed'])} | PhotoID rows updated: {results['updated_rows']}")
+    for name, error in results["failed"].items():
+        print(f"  {name}: {error}")
+    sys.exit(1 if results["failed"] else 0)
+
+
+if __name__ == "__main__":
+    main()
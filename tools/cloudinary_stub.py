@@ -0,0 +1,91 @@
+"""
+File: tools/cloudinary_stub.py
+Function: Local stand-in for Cloudinary's upload API (offline testing of the bulk headshot pipeline)
+Author: Joseph Cho, ujcho@jacksongov.org
+
+Accepts POST /v1_1/<cloud_name>/image/upload, stores the file under --out-dir and answers with
+the same JSON fields Cloudinary returns. --fail-rate randomly answers 500 to exercise retries.
+
+Usage:
+    python tools/cloudinary_stub.py --port 8765 --out-dir /tmp/cloudinary_stub
+    python tools/bulk_upload_headshots.py new_class/ --upload-prefix http://127.0.0.1:8765 --dry-run
+"""
+
+import argparse
+import json
+import random
+import time
+from email.parser import BytesParser
+from email.policy import HTTP
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+
+# --- Request handler ---
+
+class UploadHandler(BaseHTTPRequestHandler):
+    out_dir = Path(".")
+    fail_rate = 0.0
+
+    def do_POST(self):
+        if not self.path.endswith("/image/upload"):
+            return self._reply(404, {"error": {"message": f"Unknown endpoint {self.path}"}})
+        if random.random() < self.fail_rate:
+            return self._reply(500, {"error": {"message": "Simulated server error"}})
+
+        body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        message = BytesParser(policy=HTTP).parsebytes(
+            f"Content-Type: {self.headers['Content-Type']}\r\n\r\n".encode() + body
+        )
+        fields, file_bytes = {}, b""
+        for part in message.iter_parts():
+            name = part.get_param("name", header="content-disposition")
+            if part.get_filename():
+                file_bytes = part.get_payload(decode=True)
+            else:
+                fields[name] = part.get_content().strip()
+
+        public_id = fields.get("public_id", f"upload_{int(time.time() * 1000)}")
+        target = self.out_dir / f"{public_id}.jpg"
+        target.parent.mkdir(parents=True, exist_ok=True)
+        target.write_bytes(file_bytes)
+
+        version = int(time.time())
+        self._reply(200, {
+            "public_id": public_id,
+            "version": version,
+            "format": "jpg",
+            "bytes": len(file_bytes),
+            "secure_url": f"http://{self.headers['Host']}/image/upload/v{version}/{public_id}.jpg",
+        })
+
+    def _reply(self, status: int, payload: dict):
+        data = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass
+
+
+# --- Main ---
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--out-dir", type=Path, default=Path("cloudinary_stub"))
+    parser.add_argument("--fail-rate", type=float, default=0.0, help="fraction of uploads answered with HTTP 500")
+    args = parser.parse_args()
+
+    UploadHandler.out_dir = args.out_dir
+    UploadHandler.fail_rate = args.fail_rate
+    server = ThreadingHTTPServer(("127.0.0.1", args.port), UploadHandler)
+    print(f"Cloudinary upload stub on http://127.0.0.1:{args.port} (files -> {args.out_dir})")
+    server.serve_forever()
+
+
+if __name__ == "__main__":
+    main()